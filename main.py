@@ -1,14 +1,55 @@
 import argparse
+import contextlib
+import copy
+import functools
+import io
 import logging
+import mmap
 import os
+import re
+import shutil
+import struct
 import sys
 import zipfile
-import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from lxml import etree as ET  # lxml for getparent() and faster parsing/serialization
 import csv
-import pandas as pd  # Using pandas for more robust CSV handling
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    # Optional drop-in zlib replacement with a much faster deflate encoder
+    from zlib_ng import zlib_ng
+    zipfile.zlib = zlib_ng
+    zipfile.crc32 = zlib_ng.crc32
+except ImportError:
+    pass
+
+# Deflate level for rewritten archive members. Levels above 3 are much slower for little size gain on XML.
+DEFAULT_COMPRESS_LEVEL = 3
+
+# Number of rows read per chunk by the pandas CSV fallback
+CSV_CHUNK_SIZE = 50_000
+
+# Input archives at least this large are memory-mapped instead of read through the file object
+MMAP_THRESHOLD = 10 * 1024 * 1024
+
+# Namespace-qualified tag and attribute names, resolved once at import
+SPREADSHEETML_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+ODF_TABLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+ODF_STYLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:style:1.0'
+SHEET_NAME = f'{SPREADSHEETML_NS} sheet'  # As reported by expat with namespace_separator=' '
+TABLE_TAG = f'{{{ODF_TABLE_NS}}}table'
+TABLE_DISPLAY = f'{{{ODF_TABLE_NS}}}display'
+TABLE_NAME = f'{{{ODF_TABLE_NS}}}name'
+TABLE_STYLE_NAME = f'{{{ODF_TABLE_NS}}}style-name'
+STYLE_TAG = f'{{{ODF_STYLE_NS}}}style'
+STYLE_NAME = f'{{{ODF_STYLE_NS}}}name'
+STYLE_FAMILY = f'{{{ODF_STYLE_NS}}}family'
+TABLE_PROPERTIES_TAG = f'{{{ODF_STYLE_NS}}}table-properties'
+
+# Patterns that must match an XML part for it to declare a hidden sheet. Visible ODS tables
+# usually carry display="true" on their style, so the ODS pattern includes the value.
+XLSX_HIDDEN_PATTERN = re.compile(rb'hidden|veryHidden')
+ODS_HIDDEN_PATTERN = re.compile(rb'display\s*=\s*["\']false')
 
 def setup_argparse():
     """
@@ -20,11 +61,294 @@ def setup_argparse():
     parser.add_argument("--remove-macros", action="store_true", help="Remove VBA macros (xlsx only).")
     parser.add_argument("--remove-hidden-sheets", action="store_true", help="Remove hidden sheets (xlsx and ods).")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite the output file if it exists.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress messages, not just warnings and errors.")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=DEFAULT_COMPRESS_LEVEL, metavar="{0-9}",
+                        help=f"Deflate level for rewritten members (xlsx and ods, default {DEFAULT_COMPRESS_LEVEL}).")
 
     return parser.parse_args()
 
 
-def sanitize_xlsx(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite):
+class MappedFile:
+    """
+    Minimal read-only file object over a memory map, for use by zipfile.
+    Member reads become copies from the page cache instead of read syscalls.
+    """
+
+    def __init__(self, mm):
+        self._mm = mm
+
+    def read(self, size=-1):
+        return self._mm.read(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._mm.seek(offset, whence)
+        return self._mm.tell()
+
+    def tell(self):
+        return self._mm.tell()
+
+    def seekable(self):
+        return True
+
+
+def is_same_file(input_file, output_file):
+    """
+    Checks whether the output path refers to the input file itself.
+
+    Args:
+        input_file (str): Path to the input file.
+        output_file (str): Path to the output file.
+
+    Returns:
+        bool: True if both paths are the same existing file.
+    """
+    return os.path.exists(output_file) and os.path.samefile(input_file, output_file)
+
+
+@contextlib.contextmanager
+def open_input_archive(input_file):
+    """
+    Opens an input zip archive for reading, memory-mapping it if it is large.
+
+    Args:
+        input_file (str): Path to the input archive.
+
+    Yields:
+        zipfile.ZipFile: The archive, opened for reading.
+    """
+    with open(input_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            with zipfile.ZipFile(f, 'r') as zin:
+                yield zin
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                zipfile.ZipFile(MappedFile(mm), 'r') as zin:
+            yield zin
+
+
+def copy_member(zin, zout, item):
+    """
+    Copies an unmodified archive member from one zip file to another.
+    The already-compressed bytes are copied verbatim, so the member is never decompressed
+    or recompressed, and encrypted members are copied without needing their password.
+    ZIP64-sized members are streamed through zipfile instead.
+
+    Args:
+        zin (zipfile.ZipFile): The source archive, opened for reading.
+        zout (zipfile.ZipFile): The destination archive, opened for writing.
+        item (zipfile.ZipInfo): The member to copy.
+    """
+    if item.file_size > zipfile.ZIP64_LIMIT or item.compress_size > zipfile.ZIP64_LIMIT:
+        # zout.open() resets the sizes and flags of the ZipInfo it is given, so pass a copy
+        with zin.open(item, 'r') as src, zout.open(copy.copy(item), 'w') as dst:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+        return
+
+    zinfo = copy.copy(item)
+    if not zinfo.flag_bits & 0x01:
+        # Sizes and CRC are known up front, so the copy needs no data descriptor.
+        # Encrypted members keep it: with bit 3 set, the password check byte in their
+        # encryption header is derived from the modification time instead of the CRC.
+        zinfo.flag_bits &= ~0x08
+
+    with zin._lock, zout._lock:
+        # Skip the local file header to find the start of the compressed data
+        zin.fp.seek(item.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, zin.fp.read(zipfile.sizeFileHeader))
+        zin.fp.seek(header[10] + header[11], os.SEEK_CUR)  # File name and extra field lengths
+
+        if zout._seekable:
+            zout.fp.seek(zout.start_dir)
+        zinfo.header_offset = zout.fp.tell()
+        zout._writecheck(zinfo)
+        zout._didModify = True
+        zout.fp.write(zinfo.FileHeader(False))
+
+        remaining = item.compress_size
+        while remaining:
+            chunk = zin.fp.read(min(remaining, 1 << 20))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated data for member '{item.filename}'")
+            zout.fp.write(chunk)
+            remaining -= len(chunk)
+
+        if zinfo.flag_bits & 0x08:
+            # The local header leaves CRC and sizes zeroed, so they follow the data
+            zout.fp.write(struct.pack('<4L', 0x08074b50, zinfo.CRC, zinfo.compress_size, zinfo.file_size))
+
+        zout.start_dir = zout.fp.tell()
+        zout.filelist.append(zinfo)
+        zout.NameToInfo[zinfo.filename] = zinfo
+
+
+def rewritten_member_info(item):
+    """
+    Builds the ZipInfo for a member whose content was modified.
+    The name, timestamp and permissions of the original member are kept.
+
+    Args:
+        item (zipfile.ZipInfo): The original member.
+
+    Returns:
+        zipfile.ZipInfo: A fresh ZipInfo for writing the modified content with deflate compression.
+    """
+    zinfo = zipfile.ZipInfo(filename=item.filename, date_time=item.date_time)
+    zinfo.external_attr = item.external_attr
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    return zinfo
+
+
+def may_contain_hidden_sheets(content, pattern):
+    """
+    Cheaply checks whether an XML part could declare hidden sheets, without parsing it.
+
+    Args:
+        content (bytes): The raw XML part.
+        pattern (re.Pattern): A bytes pattern that any hidden sheet declaration matches.
+
+    Returns:
+        bool: False only if the part certainly declares no hidden sheets.
+    """
+    # Wide encodings (UTF-16/32), character references and entities declared in a DTD can
+    # spell a marker without it appearing in the raw bytes, so those parts are always parsed
+    if b'\x00' in content[:4] or b'&#' in content or b'<!ENTITY' in content:
+        return True
+    return pattern.search(content) is not None
+
+
+def remove_hidden_xlsx_sheets(zin, item):
+    """
+    Reads an XLSX workbook.xml member and removes its hidden sheets.
+
+    Args:
+        zin (zipfile.ZipFile): The source archive, opened for reading.
+        item (zipfile.ZipInfo): The workbook.xml member.
+
+    Returns:
+        bytes: The rewritten workbook.xml, or None if it declares no hidden sheets.
+    """
+    logging.info("Removing hidden sheets.")
+    content = zin.read(item)
+    if not may_contain_hidden_sheets(content, XLSX_HIDDEN_PATTERN):
+        return None
+
+    # Stream the part through expat and cut the byte ranges of hidden sheet elements out of the
+    # original buffer. No tree is built and everything else is kept byte for byte.
+    parser = expat.ParserCreate(namespace_separator=' ')
+    ranges = []  # (start, end) byte offsets of the hidden sheet elements
+    hidden = None  # [start offset, nesting depth] of the hidden sheet being skipped
+    depth = 0
+    end_pending = False
+
+    def mark():
+        # Expat reports no end offset for elements, so a skipped sheet ends where the next event starts
+        nonlocal end_pending
+        if end_pending:
+            ranges[-1] = (ranges[-1][0], parser.CurrentByteIndex)
+            end_pending = False
+
+    def start_element(name, attrs):
+        nonlocal hidden, depth
+        mark()
+        depth += 1
+        if hidden is None and name == SHEET_NAME and attrs.get('state') in ('hidden', 'veryHidden'):
+            logging.info("Removing sheet with id %s", attrs.get('sheetId'))
+            hidden = [parser.CurrentByteIndex, depth]
+
+    def end_element(name):
+        nonlocal hidden, depth, end_pending
+        mark()
+        if hidden is not None and hidden[1] == depth:
+            ranges.append((hidden[0], None))
+            hidden = None
+            end_pending = True
+        depth -= 1
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.DefaultHandlerExpand = lambda data: mark()
+    parser.Parse(content, True)
+
+    if not ranges:
+        return None
+
+    parts = []
+    offset = 0
+    for start, end in ranges:
+        parts.append(content[offset:start])
+        offset = end
+    parts.append(content[offset:])
+    return b''.join(parts)
+
+
+def remove_hidden_ods_tables(zin, item):
+    """
+    Reads an ODS content.xml member and removes its hidden tables.
+
+    Args:
+        zin (zipfile.ZipFile): The source archive, opened for reading.
+        item (zipfile.ZipInfo): The content.xml member.
+
+    Returns:
+        bytes: The rewritten content.xml, or None if it declares no hidden tables.
+    """
+    logging.info("Removing hidden sheets from content.xml.")
+    content = zin.read(item)
+    if not may_contain_hidden_sheets(content, ODS_HIDDEN_PATTERN):
+        return None
+
+    # Remove hidden tables while parsing. Each hidden table is cleared first, which frees its cell data
+    # as soon as the element is complete and keeps the removal from being quadratic in its size.
+    # The part is untrusted, so entities, DTDs and network access are never resolved.
+    context = ET.iterparse(io.BytesIO(content), events=('end',), tag=(STYLE_TAG, TABLE_TAG),
+                           resolve_entities=False, load_dtd=False, no_network=True)
+    hidden_styles = set()
+    for _, elem in context:
+        if elem.tag == STYLE_TAG:
+            # Applications hide a table through table:display on the table-properties of its
+            # automatic style. office:automatic-styles precedes office:body, so every style
+            # is known before the tables that reference it are complete.
+            if elem.get(STYLE_FAMILY) == 'table' and any(
+                    props.get(TABLE_DISPLAY) == 'false' for props in elem.iterchildren(TABLE_PROPERTIES_TAG)):
+                hidden_styles.add(elem.get(STYLE_NAME))
+            continue
+
+        # Also honour table:display set directly on the table, display defaults to 'true'
+        if elem.get(TABLE_STYLE_NAME) in hidden_styles or elem.get(TABLE_DISPLAY) == 'false':
+            logging.info("Removing table: %s", elem.get(TABLE_NAME))
+            elem.clear(keep_tail=True)
+            elem.getparent().remove(elem)
+    return ET.tostring(context.root, xml_declaration=True, encoding='UTF-8')
+
+
+def write_edited_member(zin, zout, item, edit, compress_level):
+    """
+    Edits an XML member and writes the result in place of the original member.
+    The original member is copied unchanged if there was nothing to remove or the edit failed.
+
+    Args:
+        zin (zipfile.ZipFile): The source archive, opened for reading.
+        zout (zipfile.ZipFile): The destination archive, opened for writing.
+        item (zipfile.ZipInfo): The member to edit.
+        edit (callable): Called with (zin, item), returns the new content or None.
+        compress_level (int): Deflate level (0-9) for the rewritten member.
+    """
+    try:
+        content = edit(zin, item)
+    except Exception as e:
+        logging.error("Error parsing %s: %s", item.filename, e)
+        copy_member(zin, zout, item) # Write original file if parsing failed
+        return
+
+    if content is None:
+        copy_member(zin, zout, item) # Nothing to remove, keep the original file
+    else:
+        zout.writestr(rewritten_member_info(item), content, compresslevel=compress_level)
+
+
+def sanitize_xlsx(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite,
+                  compress_level=DEFAULT_COMPRESS_LEVEL):
     """
     Sanitizes an XLSX file.
 
@@ -34,72 +358,69 @@ def sanitize_xlsx(input_file, output_file, remove_macros, remove_hidden_sheets,
         remove_macros (bool): Whether to remove VBA macros.
         remove_hidden_sheets (bool): Whether to remove hidden sheets.
         overwrite (bool): Whether to overwrite the output file if it exists.
+        compress_level (int): Deflate level (0-9) for members that are rewritten.
     """
+    output_created = False  # Set once this run has opened the output, so a failed run can remove it
+    succeeded = False
+
     try:
-        if os.path.exists(output_file) and not overwrite:
-            logging.error(f"Output file '{output_file}' already exists. Use --overwrite to replace it.")
+        # Writing over the input would truncate it while it is still being read (or memory-mapped)
+        # Without --overwrite the exclusive open below refuses any existing output, this one included
+        if overwrite and is_same_file(input_file, output_file):
+            logging.error("Output file '%s' is the input file. Choose a different output path.", output_file)
             return False
 
-        with zipfile.ZipFile(input_file, 'r') as zin:
-            with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED) as zout:
-                for item in zin.infolist():
-                    filename = item.filename
+        with open_input_archive(input_file) as zin:
+            # Exclusive creation unless overwriting, so an existing output can't be clobbered between check and write
+            with open(output_file, 'wb' if overwrite else 'xb') as out_fp, \
+                    zipfile.ZipFile(out_fp, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compress_level) as zout:
+                output_created = True
+                # Handlers for the members that need special treatment, by name
+                special = {}
 
-                    # Remove VBA Project (macros)
-                    if remove_macros and filename == 'xl/vbaProject.bin':
-                        logging.info("Removing VBA macros.")
-                        continue
+                # Remove VBA Project (macros)
+                if remove_macros:
+                    special['xl/vbaProject.bin'] = lambda item: logging.info("Removing VBA macros.")
 
-                    # Remove hidden sheets from workbook.xml
-                    if remove_hidden_sheets and filename == 'xl/workbook.xml':
-                        logging.info("Removing hidden sheets.")
-                        content = zin.read(filename)
-                        try:
-                            tree = ET.fromstring(content)
-                            # Define XML namespaces
-                            namespaces = {'xmlns': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
-
-                            # Find all sheets
-                            sheets = tree.findall('.//xmlns:sheet', namespaces)
-                            sheets_to_remove = []
-
-                            for sheet in sheets:
-                                if sheet.get('state') == 'hidden' or sheet.get('state') == 'veryHidden':
-                                    sheets_to_remove.append(sheet.get('sheetId'))
-                                    logging.info(f"Removing sheet with id {sheet.get('sheetId')}")
-
-                            # remove the sheet
-                            for sheet in sheets:
-                                if sheet.get('sheetId') in sheets_to_remove:
-                                    sheet.getparent().remove(sheet)
-                            content = ET.tostring(tree, encoding='utf8').decode('utf8')
-                        except Exception as e:
-                            logging.error(f"Error parsing workbook.xml: {e}")
-                            zout.writestr(filename, zin.read(filename)) # Write original file if parsing failed
-                            continue
-
-                        zout.writestr(filename, content)
-                        continue #skip writing the original workbook.xml file
+                # Remove hidden sheets from workbook.xml. The handler runs for every entry with that name,
+                # so duplicate entries are each edited.
+                if remove_hidden_sheets:
+                    special['xl/workbook.xml'] = functools.partial(write_edited_member, zin, zout,
+                                                                   edit=remove_hidden_xlsx_sheets, compress_level=compress_level)
 
+                for item in zin.infolist():
+                    handler = special.get(item.filename)
+                    if handler:
+                        handler(item)
+                        continue
 
                     # Copy everything else
-                    buffer = zin.read(filename)
-                    zout.writestr(item, buffer)
-        logging.info(f"Successfully sanitized XLSX file. Output: {output_file}")
+                    copy_member(zin, zout, item)
+        logging.info("Successfully sanitized XLSX file. Output: %s", output_file)
+        succeeded = True
         return True
 
+    except FileExistsError:
+        logging.error("Output file '%s' already exists. Use --overwrite to replace it.", output_file)
+        return False
     except FileNotFoundError:
-        logging.error(f"Input file '{input_file}' not found.")
+        logging.error("Input file '%s' not found.", input_file)
         return False
     except zipfile.BadZipFile:
-        logging.error(f"Input file '{input_file}' is not a valid XLSX file.")
+        logging.error("Input file '%s' is not a valid XLSX file.", input_file)
         return False
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
+        logging.error("An unexpected error occurred: %s", e)
         return False
+    finally:
+        # Don't leave a partial output archive behind when sanitization failed
+        if output_created and not succeeded:
+            with contextlib.suppress(OSError):
+                os.remove(output_file)
 
 
-def sanitize_ods(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite):
+def sanitize_ods(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite,
+                 compress_level=DEFAULT_COMPRESS_LEVEL):
     """
     Sanitizes an ODS file. ODS files are similar to XLSX but handle hidden sheets differently.
     Macros in ODS are more complex and not directly removable with this simple approach.
@@ -110,66 +431,65 @@ def sanitize_ods(input_file, output_file, remove_macros, remove_hidden_sheets, o
         remove_macros (bool): Not directly supported for ODS (indicates intention but doesn't remove macros).
         remove_hidden_sheets (bool): Whether to remove hidden sheets.
         overwrite (bool): Whether to overwrite the output file if it exists.
+        compress_level (int): Deflate level (0-9) for members that are rewritten.
     """
+    output_created = False  # Set once this run has opened the output, so a failed run can remove it
+    succeeded = False
+
     try:
-        if os.path.exists(output_file) and not overwrite:
-            logging.error(f"Output file '{output_file}' already exists. Use --overwrite to replace it.")
+        # Writing over the input would truncate it while it is still being read (or memory-mapped)
+        # Without --overwrite the exclusive open below refuses any existing output, this one included
+        if overwrite and is_same_file(input_file, output_file):
+            logging.error("Output file '%s' is the input file. Choose a different output path.", output_file)
             return False
 
         if remove_macros:
             logging.warning("Macro removal for ODS files is not fully supported with this simple approach.")
 
-        with zipfile.ZipFile(input_file, 'r') as zin:
-            with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED) as zout:
+        with open_input_archive(input_file) as zin:
+            # Exclusive creation unless overwriting, so an existing output can't be clobbered between check and write
+            with open(output_file, 'wb' if overwrite else 'xb') as out_fp, \
+                    zipfile.ZipFile(out_fp, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compress_level) as zout:
+                output_created = True
+                # Handlers for the members that need special treatment, by name
+                special = {}
+
+                # Remove hidden sheets from content.xml. The handler runs for every entry with that name,
+                # so duplicate entries are each edited.
+                if remove_hidden_sheets:
+                    special['content.xml'] = functools.partial(write_edited_member, zin, zout,
+                                                               edit=remove_hidden_ods_tables, compress_level=compress_level)
+
                 for item in zin.infolist():
-                    filename = item.filename
-
-                    # Remove hidden sheets from content.xml
-                    if remove_hidden_sheets and filename == 'content.xml':
-                        logging.info("Removing hidden sheets from content.xml.")
-                        content = zin.read(filename)
-                        try:
-                            tree = ET.fromstring(content)
-                            namespaces = {'office': 'urn:oasis:names:tc:opendocument:xmlns:office:1.0',
-                                        'table': 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'}
-
-                            tables = tree.findall('.//table:table', namespaces)
-                            tables_to_remove = []
-                            for table in tables:
-                                if table.get('table:display', default='true', namespaces=namespaces) == 'false':  # Check for hidden tables
-                                    table_name = table.get('table:name', namespaces=namespaces)
-                                    tables_to_remove.append(table)
-                                    logging.info(f"Removing table: {table_name}")
-
-                            for table in tables_to_remove:
-                                table.getparent().remove(table)
-
-                            content = ET.tostring(tree, encoding='utf8').decode('utf8')
-
-                        except Exception as e:
-                            logging.error(f"Error parsing content.xml: {e}")
-                            zout.writestr(filename, zin.read(filename)) # Write original file if parsing failed
-                            continue
-
-                        zout.writestr(filename, content)
-                        continue # skip writing the original content.xml file
+                    handler = special.get(item.filename)
+                    if handler:
+                        handler(item)
+                        continue
 
                     # Copy everything else
-                    buffer = zin.read(filename)
-                    zout.writestr(item, buffer)
+                    copy_member(zin, zout, item)
 
-        logging.info(f"Successfully sanitized ODS file. Output: {output_file}")
+        logging.info("Successfully sanitized ODS file. Output: %s", output_file)
+        succeeded = True
         return True
 
+    except FileExistsError:
+        logging.error("Output file '%s' already exists. Use --overwrite to replace it.", output_file)
+        return False
     except FileNotFoundError:
-        logging.error(f"Input file '{input_file}' not found.")
+        logging.error("Input file '%s' not found.", input_file)
         return False
     except zipfile.BadZipFile:
-        logging.error(f"Input file '{input_file}' is not a valid ODS file.")
+        logging.error("Input file '%s' is not a valid ODS file.", input_file)
         return False
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
+        logging.error("An unexpected error occurred: %s", e)
         return False
+    finally:
+        # Don't leave a partial output archive behind when sanitization failed
+        if output_created and not succeeded:
+            with contextlib.suppress(OSError):
+                os.remove(output_file)
 
 
 def sanitize_csv(input_file, output_file, overwrite):
@@ -183,33 +503,88 @@ def sanitize_csv(input_file, output_file, overwrite):
         output_file (str): Path to the output sanitized CSV file.
         overwrite (bool): Whether to overwrite the output file if it exists.
     """
-    try:
-        if os.path.exists(output_file) and not overwrite:
-            logging.error(f"Output file '{output_file}' already exists. Use --overwrite to replace it.")
-            return False
+    # Imported here so that xlsx and ods runs don't pay the import cost of pandas and pyarrow
+    import pandas as pd  # Using pandas for more robust CSV handling
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv  # Fast multithreaded CSV reader/writer
 
-        # Use pandas for more robust CSV reading and writing
-        df = pd.read_csv(input_file)  # Let pandas handle encoding detection and quoting
+    output_created = False  # Set once this run has opened the output, so a failed run can remove it
+    succeeded = False
 
-        # Simple example: remove rows with any missing values
-        df = df.dropna()  # Remove rows with missing values. Good for sanitization
-        df.to_csv(output_file, index=False) # Write the DataFrame to a CSV file
+    try:
+        # Writing over the input would truncate it before it has been read
+        # Without --overwrite the exclusive open below refuses any existing output, this one included
+        if overwrite and is_same_file(input_file, output_file):
+            logging.error("Output file '%s' is the input file. Choose a different output path.", output_file)
+            return False
 
-        logging.info(f"Successfully sanitized CSV file. Output: {output_file}")
+        # Exclusive creation unless overwriting, so an existing output can't be clobbered between check and write
+        mode = 'w' if overwrite else 'x'
+
+        # Use pyarrow to stream the CSV in record batches, so memory use does not grow with file size.
+        # Empty strings count as missing, like in pandas.
+        try:
+            reader = pacsv.open_csv(input_file, convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+            with reader, open(output_file, mode + 'b') as out_fp, pacsv.CSVWriter(out_fp, reader.schema) as writer:
+                output_created = True
+                mode = 'w'  # The output file is ours now, the fallback may replace it
+                for batch in reader:
+                    # Simple example: remove rows with any missing values
+                    writer.write_batch(pc.drop_null(batch))
+        except pa.ArrowInvalid as e:
+            logging.warning("pyarrow could not parse '%s' (%s). Falling back to pandas.", input_file, e)
+
+            # Use pandas for more robust CSV reading, one chunk at a time. Chunks are written with
+            # pyarrow's writer so that quoting and value formatting match the pyarrow path. Each
+            # chunk is written separately because pandas may infer different types per chunk.
+            with pd.read_csv(input_file, chunksize=CSV_CHUNK_SIZE, dtype_backend='pyarrow') as chunks, \
+                    open(output_file, mode + 'b') as f:
+                output_created = True
+                for i, chunk in enumerate(chunks):
+                    # Remove rows with missing values. Good for sanitization
+                    table = pa.Table.from_pandas(chunk.dropna(), preserve_index=False)
+                    pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=(i == 0)))
+
+        logging.info("Successfully sanitized CSV file. Output: %s", output_file)
+        succeeded = True
         return True
 
+    except FileExistsError:
+        logging.error("Output file '%s' already exists. Use --overwrite to replace it.", output_file)
+        return False
     except FileNotFoundError:
-        logging.error(f"Input file '{input_file}' not found.")
+        logging.error("Input file '%s' not found.", input_file)
         return False
     except pd.errors.EmptyDataError:
-         logging.error(f"Input file '{input_file}' is empty.")
+         logging.error("Input file '%s' is empty.", input_file)
          return False
     except pd.errors.ParserError:
-        logging.error(f"Input file '{input_file}' is not a valid CSV file.")
+        logging.error("Input file '%s' is not a valid CSV file.", input_file)
         return False
     except Exception as e:
-        logging.error(f"An unexpected error occurred: {e}")
+        logging.error("An unexpected error occurred: %s", e)
         return False
+    finally:
+        # Don't leave an empty or truncated output behind when sanitization failed
+        if output_created and not succeeded:
+            with contextlib.suppress(OSError):
+                os.remove(output_file)
+
+
+def _csv_adapter(input_file, output_file, overwrite, **_):
+    """
+    Calls sanitize_csv with the arguments it supports, ignoring the archive-only options.
+    """
+    return sanitize_csv(input_file, output_file, overwrite)
+
+
+# Sanitization function for each supported file extension
+HANDLERS = {
+    '.xlsx': sanitize_xlsx,
+    '.ods': sanitize_ods,
+    '.csv': _csv_adapter,
+}
 
 
 def main():
@@ -217,29 +592,25 @@ def main():
     Main function to parse arguments and call the appropriate sanitization function.
     """
     args = setup_argparse()
-    input_file = args.input_file
-    output_file = args.output_file
-    remove_macros = args.remove_macros
-    remove_hidden_sheets = args.remove_hidden_sheets
-    overwrite = args.overwrite
 
-    # Determine file type based on extension
-    file_extension = os.path.splitext(input_file)[1].lower()
-
-    if file_extension == '.xlsx':
-        if not sanitize_xlsx(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite):
-            sys.exit(1) # Exit with error code if sanitization failed
-    elif file_extension == '.ods':
-        if not sanitize_ods(input_file, output_file, remove_macros, remove_hidden_sheets, overwrite):
-            sys.exit(1) # Exit with error code if sanitization failed
-    elif file_extension == '.csv':
-        if not sanitize_csv(input_file, output_file, overwrite):
-            sys.exit(1)  # Exit with error code if sanitization failed
+    # Configure logging. Only warnings and errors are shown unless --verbose is given.
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     else:
+        logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    # Determine file type based on extension
+    file_extension = os.path.splitext(args.input_file)[1].lower()
+
+    handler = HANDLERS.get(file_extension)
+    if handler is None:
         logging.error("Unsupported file type.  Supported types are .xlsx, .ods, and .csv")
         sys.exit(1) # Exit with error code for unsupported file type
 
-    sys.exit(0)  # Exit with success code
+    success = handler(input_file=args.input_file, output_file=args.output_file, remove_macros=args.remove_macros,
+                      remove_hidden_sheets=args.remove_hidden_sheets, overwrite=args.overwrite,
+                      compress_level=args.compress_level)
+    sys.exit(0 if success else 1)  # Exit with error code if sanitization failed
 
 
 if __name__ == "__main__":